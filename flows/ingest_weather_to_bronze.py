@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
-from prefect import flow, task, get_run_logger
+import google_crc32c
+import httpx
+import orjson
+import zstandard as zstd
+from prefect import flow, get_run_logger
 from google.cloud import storage
+from google.cloud.exceptions import NotFound
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv()
 
@@ -24,7 +30,7 @@ class Settings:
     gcs_bucket: str
 
     # Optional
-    city_name: str = "Abidjan,CI"
+    cities: tuple[str, ...] = ("Abidjan,CI",)
     gcs_prefix: str = "bronze/weather"  # bronze/weather/YYYY/MM/DD/...
     request_timeout_sec: int = 20
     units: str = "metric"  # metric | imperial | standard
@@ -39,10 +45,16 @@ def load_settings() -> Settings:
     if not bucket:
         raise ValueError("Missing env var: GCS_BRONZE_BUCKET")
 
+    # ";"-separated since OpenWeather city queries contain commas (Abidjan,CI)
+    raw_cities = os.getenv("WEATHER_CITIES", os.getenv("WEATHER_CITY", "Abidjan,CI"))
+    cities = tuple(c.strip() for c in raw_cities.split(";") if c.strip())
+    if not cities:
+        raise ValueError("Missing env var: WEATHER_CITIES")
+
     return Settings(
         openweather_api_key=api_key,
         gcs_bucket=bucket,
-        city_name=os.getenv("WEATHER_CITY", "Abidjan,CI").strip(),
+        cities=cities,
         gcs_prefix=os.getenv("GCS_BRONZE_PREFIX", "bronze/weather").strip(),
         request_timeout_sec=int(os.getenv("REQUEST_TIMEOUT_SEC", "20")),
         units=os.getenv("OPENWEATHER_UNITS", "metric").strip(),
@@ -51,7 +63,9 @@ def load_settings() -> Settings:
 
 def _utc_partition(now: Optional[datetime] = None) -> tuple[str, str, str]:
     now = now or datetime.now(timezone.utc)
-    return now.strftime("%Y"), now.strftime("%m"), now.strftime("%d")
+    # Slice the ISO date (YYYY-MM-DD...) rather than three strftime calls
+    s = now.isoformat()
+    return s[0:4], s[5:7], s[8:10]
 
 
 def _build_gcs_object_path(settings: Settings, now: Optional[datetime] = None) -> str:
@@ -60,38 +74,80 @@ def _build_gcs_object_path(settings: Settings, now: Optional[datetime] = None) -
     return f"{settings.gcs_prefix}/{yyyy}/{mm}/{dd}/data.json"
 
 
+# Bronze JSON is dominated by repeated keys: level 3 compresses it ~10x, cheaply
+_ZSTD_COMPRESSOR = zstd.ZstdCompressor(level=3)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _http_client(settings: Settings) -> httpx.AsyncClient:
+    # One pooled HTTP/2 connection for all cities; retries are handled in fetch_weather
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=settings.request_timeout_sec,
+        limits=httpx.Limits(max_connections=32),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _gcs_client() -> storage.Client:
+    # ADC: uses local gcloud ADC or workload identity / service account in cloud.
+    # Cached so retries / repeated calls reuse the authenticated session.
+    return storage.Client()
+
+
+class OpenWeatherClientError(Exception):
+    """4xx from OpenWeather (API key, unknown city...): a config error, never retried."""
+
+
 # -----------------------
-# Tasks
+# Steps (plain functions: a fetch fan-out + one write don't need Prefect task runs)
 # -----------------------
 
-@task(retries=3, retry_delay_seconds=[10, 30, 90])
-def fetch_weather(settings: Settings) -> Dict[str, Any]:
+def _log_retry(retry_state) -> None:
+    get_run_logger().warning(
+        f"OpenWeather attempt {retry_state.attempt_number} failed, "
+        f"retrying in {retry_state.next_action.sleep:.0f}s | {retry_state.outcome.exception()}"
+    )
+
+
+# 3 retries, ~10s / 30s / 90s apart (+ jitter)
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=10, exp_base=3, max=90),
+    retry=retry_if_exception_type(RuntimeError),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+async def fetch_weather(settings: Settings, client: httpx.AsyncClient, city: str) -> Dict[str, Any]:
     """
-    Fetch raw data from OpenWeather Current Weather API, enrich with minimal metadata.
-    Retries (with backoff) handled by Prefect.
+    Fetch raw data for one city from OpenWeather Current Weather API, enrich with minimal metadata.
+    Retries (with backoff) handled by tenacity, per city, inside the flow run.
     """
     logger = get_run_logger()
 
     url = "https://api.openweathermap.org/data/2.5/weather"
     params = {
-        "q": settings.city_name,
+        "q": city,
         "appid": settings.openweather_api_key,
         "units": settings.units,
     }
 
-    logger.info(f"Calling OpenWeather | city={settings.city_name} | units={settings.units}")
+    logger.info(f"Calling OpenWeather | city={city} | units={settings.units}")
 
     try:
-        resp = requests.get(url, params=params, timeout=settings.request_timeout_sec)
-    except requests.RequestException as e:
+        resp = await client.get(url, params=params)
+    except httpx.HTTPError as e:
         # Retry-worthy (network layer)
         raise RuntimeError(f"Network error calling OpenWeather: {e}") from e
 
-    # Retry on 5xx (provider-side issues)
-    if 500 <= resp.status_code <= 599:
-        raise RuntimeError(f"OpenWeather 5xx: {resp.status_code} | {resp.text[:200]}")
+    # Retry on 5xx (provider-side issues) and 429 (rate limited)
+    if 500 <= resp.status_code <= 599 or resp.status_code == 429:
+        raise RuntimeError(f"OpenWeather {resp.status_code} | {resp.text[:200]}")
 
     # Fail fast on 4xx (usually config: API key/city)
+    if 400 <= resp.status_code <= 499:
+        raise OpenWeatherClientError(f"OpenWeather 4xx: {resp.status_code} | city={city} | {resp.text[:200]}")
+
     if resp.status_code != 200:
         raise RuntimeError(f"OpenWeather non-200: {resp.status_code} | {resp.text[:200]}")
 
@@ -102,7 +158,7 @@ def fetch_weather(settings: Settings) -> Dict[str, Any]:
             "fetched_at_utc": datetime.now(timezone.utc).isoformat(),
             "source": "openweather",
             "endpoint": "current_weather",
-            "city": settings.city_name,
+            "city": city,
             "units": settings.units,
             "http_status": resp.status_code,
         },
@@ -112,23 +168,79 @@ def fetch_weather(settings: Settings) -> Dict[str, Any]:
     return enriched
 
 
-@task
-def write_to_gcs(settings: Settings, record: Dict[str, Any]) -> str:
+async def fetch_all(settings: Settings) -> Tuple[List[Dict[str, Any]], Dict[str, BaseException]]:
+    """
+    Fetch every configured city concurrently (~1 RTT instead of N).
+    One failing city does not block the others: every fetch runs to completion
+    (return_exceptions) before the client is closed.
+    Returns: (records of the cities that succeeded, {city: error} for the others)
     """
-    Write raw JSON (Bronze) to GCS using ADC credentials.
+    async with _http_client(settings) as client:
+        results = await asyncio.gather(
+            *(fetch_weather(settings, client, c) for c in settings.cities),
+            return_exceptions=True,
+        )
+
+    records, failures = [], {}
+    for city, result in zip(settings.cities, results):
+        if isinstance(result, BaseException):
+            failures[city] = result
+        else:
+            records.append(result)
+    return records, failures
+
+
+def read_previous_records(settings: Settings, cities: List[str]) -> List[Dict[str, Any]]:
+    """
+    Records of the given cities from today's Bronze object, if it already exists.
+    The day object is overwritten on every run: a city that failed now keeps its
+    earlier line instead of being dropped from Bronze.
+    """
+    blob = _gcs_client().bucket(settings.gcs_bucket).blob(_build_gcs_object_path(settings))
+    try:
+        raw = blob.download_as_bytes()
+    except NotFound:
+        return []
+
+    # Objects written before zstd compression are plain JSON
+    if raw[:4] == _ZSTD_MAGIC:
+        raw = zstd.ZstdDecompressor().decompress(raw)
+
+    wanted = set(cities)
+    previous = (orjson.loads(line) for line in raw.splitlines() if line.strip())
+    return [r for r in previous if (r.get("_meta") or {}).get("city") in wanted]
+
+
+def write_to_gcs(settings: Settings, records: List[Dict[str, Any]]) -> str:
+    """
+    Write raw JSON (Bronze) to GCS using ADC credentials, zstd-compressed
+    (the Silver reader decompresses).
+    One object per run, as NDJSON: one line per city record.
+    Integrity check: CRC32C only (hardware-accelerated via google-crc32c), no MD5.
     """
     logger = get_run_logger()
 
+    if google_crc32c.implementation != "c":
+        logger.warning("google-crc32c C extension not loaded, CRC32C falls back to pure Python")
+
     object_path = _build_gcs_object_path(settings)
-    payload_bytes = json.dumps(record, ensure_ascii=False).encode("utf-8")
+    payload_bytes = b"\n".join(
+        orjson.dumps(r, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) for r in records
+    )
+    compressed = _ZSTD_COMPRESSOR.compress(payload_bytes)
 
-    # ADC: uses local gcloud ADC or workload identity / service account in cloud
-    client = storage.Client()
+    client = _gcs_client()
     bucket = client.bucket(settings.gcs_bucket)
     blob = bucket.blob(object_path)
 
-    logger.info(f"Writing Bronze JSON -> gs://{settings.gcs_bucket}/{object_path} ({len(payload_bytes)} bytes)")
-    blob.upload_from_string(payload_bytes, content_type="application/json")
+    logger.info(
+        f"Writing Bronze JSON -> gs://{settings.gcs_bucket}/{object_path} "
+        f"({len(records)} records, {len(payload_bytes)} bytes, {len(compressed)} compressed)"
+    )
+    # Stored as application/zstd, not Content-Encoding: zstd. If the header were
+    # set, urllib3 could decode the response transparently and the CRC32C check
+    # would then run on the decompressed bytes, so the check would fail.
+    blob.upload_from_string(compressed, content_type="application/zstd", checksum="crc32c")
 
     return f"gs://{settings.gcs_bucket}/{object_path}"
 
@@ -138,17 +250,39 @@ def write_to_gcs(settings: Settings, record: Dict[str, Any]) -> str:
 # -----------------------
 
 @flow(name="sentinel_ingest_weather_to_bronze")
-def ingest_weather_to_bronze() -> str:
+async def ingest_weather_to_bronze() -> str:
     """
     Orchestrates:
-      - fetch_weather (retries + backoff)
+      - fetch_all: fetch_weather for every city, concurrently (retries + backoff on 5xx/network)
       - write_to_gcs (single attempt; if it fails, the flow fails)
+
+    Cities that succeeded are written even if others failed, together with the
+    failed cities' earlier line from today's object (never a partial overwrite of
+    an existing day); the flow still fails afterwards so the bad cities are visible.
+    No city => nothing written, today's object is left as is.
     """
+    logger = get_run_logger()
+
     settings = load_settings()
-    record = fetch_weather(settings)
-    gcs_uri = write_to_gcs(settings, record)
+    records, failures = await fetch_all(settings)
+    for city, error in failures.items():
+        logger.error(f"OpenWeather fetch failed | city={city} | {error!r}")
+
+    if not records:
+        raise RuntimeError(f"OpenWeather fetch failed for every city: {sorted(failures)}") from next(iter(failures.values()))
+
+    if failures:
+        kept = read_previous_records(settings, list(failures))
+        if kept:
+            logger.warning(f"Keeping earlier Bronze line for {sorted(r['_meta']['city'] for r in kept)}")
+        records += kept
+
+    gcs_uri = write_to_gcs(settings, records)
+
+    if failures:
+        raise RuntimeError(f"Bronze written to {gcs_uri}, but fetch failed for {sorted(failures)}")
     return gcs_uri
 
 
 if __name__ == "__main__":
-    print(ingest_weather_to_bronze())
+    print(asyncio.run(ingest_weather_to_bronze()))
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
-import json
+import io
+import functools
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+import zstandard as zstd
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.cloud import bigquery
+from google.cloud.exceptions import NotFound
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 
@@ -24,6 +34,11 @@ class Settings:
     bq_project: str
     bq_dataset: str  # sentinel_silver
     bq_table: str    # weather_observations
+    checkpoint_path: str = "_checkpoints/silver.json"  # in the Bronze bucket
+    # Read by BigQuery as an external table: the bucket must be in the dataset's
+    # location (BQ_LOCATION). Defaults to the Bronze bucket.
+    staging_bucket: str = "sentinel-bronze"
+    staging_path: str = "_staging/silver/weather_observations.parquet"
 
 def load_settings() -> Settings:
     bucket = os.getenv("GCS_BRONZE_BUCKET", "sentinel-bronze").strip()
@@ -33,6 +48,9 @@ def load_settings() -> Settings:
     project = os.getenv("BQ_PROJECT", os.getenv("GCLOUD_PROJECT", "spherical-booth-474518-n6")).strip()
     dataset = os.getenv("BQ_SILVER_DATASET", "sentinel_silver").strip()
     table = os.getenv("BQ_SILVER_TABLE", "weather_observations").strip()
+    checkpoint = os.getenv("SILVER_CHECKPOINT_PATH", "_checkpoints/silver.json").strip()
+    staging_bucket = os.getenv("SILVER_STAGING_BUCKET", bucket).strip()
+    staging = os.getenv("SILVER_STAGING_PATH", "_staging/silver/weather_observations.parquet").strip()
 
     if not bucket:
         raise ValueError("Missing GCS_BRONZE_BUCKET")
@@ -47,53 +65,163 @@ def load_settings() -> Settings:
         bq_project=project,
         bq_dataset=dataset,
         bq_table=table,
+        checkpoint_path=checkpoint,
+        staging_bucket=staging_bucket,
+        staging_path=staging,
     )
 
 
+# Rows per staged batch / MERGE
+BATCH_SIZE = 10_000
+DOWNLOAD_WORKERS = 16
+BQ_LOCATION = "europe-west9"
+
+
+# -----------------------
+# Clients (one per process: ADC discovery + TLS setup happen once)
+# -----------------------
+
+@functools.lru_cache(maxsize=1)
+def _gcs_client() -> storage.Client:
+    # Size the HTTP pool for the download thread pool (urllib3 defaults to 10).
+    # Mounting a plain HTTPAdapter replaces google-auth's own adapter: mutual TLS
+    # (GOOGLE_API_USE_CLIENT_CERTIFICATE / configure_mtls_channel) is not supported.
+    client = storage.Client()
+    adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS)
+    client._http.mount("https://", adapter)
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def _bq_client(project: str, location: str) -> bigquery.Client:
+    return bigquery.Client(project=project, location=location)
+
+
 # -----------------------
-# 1) Read latest Bronze JSON from GCS
+# 0) Checkpoint (watermark + Bronze generations already merged into Silver)
 # -----------------------
 
-def read_latest_bronze_from_gcs(settings: Settings) -> Tuple[Dict[str, Any], str]:
+@dataclass(frozen=True)
+class Checkpoint:
+    watermark_utc: Optional[datetime] = None  # last observed_at_utc merged
+    generations: Dict[str, int] = field(default_factory=dict)  # Bronze object name -> generation
+
+
+def read_checkpoint(settings: Settings) -> Checkpoint:
     """
-    Finds and downloads the latest Bronze file from:
-      gs://{bucket}/{prefix}/YYYY/MM/DD/data.json
+    Reads the checkpoint from gs://{bucket}/{checkpoint_path}.
+    Empty when no checkpoint exists yet (first run => full backfill).
+    """
+    client = _gcs_client()
+    blob = client.bucket(settings.gcs_bucket).blob(settings.checkpoint_path)
+    try:
+        checkpoint = orjson.loads(blob.download_as_bytes())
+    except NotFound:
+        return Checkpoint()
+
+    watermark = checkpoint.get("watermark_utc")
+    return Checkpoint(
+        watermark_utc=datetime.fromisoformat(watermark) if watermark else None,
+        generations=checkpoint.get("generations") or {},
+    )
+
+
+def write_checkpoint(settings: Settings, checkpoint: Checkpoint) -> None:
+    client = _gcs_client()
+    blob = client.bucket(settings.gcs_bucket).blob(settings.checkpoint_path)
+    payload = orjson.dumps({
+        "watermark_utc": checkpoint.watermark_utc.isoformat() if checkpoint.watermark_utc else None,
+        "generations": checkpoint.generations,
+    })
+    blob.upload_from_string(payload, content_type="application/json")
+
+
+# -----------------------
+# 1) Read Bronze JSON from GCS
+# -----------------------
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZSTD_DECOMPRESSOR = zstd.ZstdDecompressor()
+
+
+def _decode_payload(raw: bytes) -> bytes:
+    # Bronze is zstd-compressed since the writer switched; older objects are plain JSON
+    if raw[:4] == _ZSTD_MAGIC:
+        return _ZSTD_DECOMPRESSOR.decompress(raw)
+    return raw
+
+
+def _parse_ndjson(payload: bytes) -> List[Dict[str, Any]]:
+    # Bronze data.json: one JSON record per line (one line per city)
+    return [orjson.loads(line) for line in payload.splitlines() if line.strip()]
+
+
+def _utc_partition(now: Optional[datetime] = None) -> tuple[str, str, str]:
+    now = now or datetime.now(timezone.utc)
+    # Slice the ISO date (YYYY-MM-DD...) rather than three strftime calls
+    s = now.isoformat()
+    return s[0:4], s[5:7], s[8:10]
+
 
-    Strategy: list blobs under prefix and take the lexicographically last name.
-    Returns: (record_dict, gcs_uri)
+def _download_many(blobs: List[storage.Blob]) -> List[bytes]:
     """
-    client = storage.Client()
-    bucket = client.bucket(settings.gcs_bucket)
+    Concurrent GETs (latency bound, the GIL is released on socket wait).
+    Threads rather than processes: payloads are small and the pooled client is shared.
+    """
+    buffers = [io.BytesIO() for _ in blobs]
+    transfer_manager.download_many(
+        list(zip(blobs, buffers)),
+        max_workers=DOWNLOAD_WORKERS,
+        worker_type=transfer_manager.THREAD,
+        raise_exception=True,
+    )
+    return [buf.getvalue() for buf in buffers]
 
-    blobs = list(client.list_blobs(settings.gcs_bucket, prefix=f"{settings.gcs_prefix}/"))
-    if not blobs:
-        raise FileNotFoundError(f"No blobs found under gs://{settings.gcs_bucket}/{settings.gcs_prefix}/")
 
-    # Lexicographic order works because path contains YYYY/MM/DD
-    latest_blob = sorted(blobs, key=lambda b: b.name)[-1]
+def read_bronze_since(settings: Settings, checkpoint: Checkpoint) -> Tuple[List[bytes], Dict[str, int]]:
+    """
+    Downloads every Bronze data.json whose date partition is >= the watermark date
+    (all of them when there is no watermark).
+
+    The watermark day itself is re-listed (its file is overwritten by later Bronze runs)
+    but only downloaded when its generation differs from the checkpoint: listing already
+    returns the metadata, so an unchanged Bronze costs no GET at all. Listed blobs carry
+    their generation, so downloads are pinned to it (no race with a concurrent write).
+    Returns: (raw NDJSON payloads of new/changed files in path (= date) order,
+              generations of all listed files)
+    """
+    client = _gcs_client()
 
-    # Guard: only accept data.json objects (optional but keeps it clean)
-    if not latest_blob.name.endswith("/data.json"):
-        # Try to find the latest data.json specifically
-        candidates = [b for b in blobs if b.name.endswith("/data.json")]
-        if not candidates:
-            raise FileNotFoundError("No data.json found under prefix")
-        latest_blob = sorted(candidates, key=lambda b: b.name)[-1]
+    watermark_ts = checkpoint.watermark_utc
+    start_offset = None
+    if watermark_ts is not None:
+        yyyy, mm, dd = _utc_partition(watermark_ts.astimezone(timezone.utc))
+        start_offset = f"{settings.gcs_prefix}/{yyyy}/{mm}/{dd}/"
 
-    raw = latest_blob.download_as_bytes()
-    record = json.loads(raw.decode("utf-8"))
+    blobs = [
+        b
+        for b in client.list_blobs(
+            settings.gcs_bucket,
+            prefix=f"{settings.gcs_prefix}/",
+            start_offset=start_offset,
+        )
+        if b.name.endswith("/data.json")
+    ]
+    blobs.sort(key=lambda b: b.name)
 
-    gcs_uri = f"gs://{settings.gcs_bucket}/{latest_blob.name}"
-    return record, gcs_uri
+    generations = {b.name: b.generation for b in blobs}
+    changed = [b for b in blobs if checkpoint.generations.get(b.name) != b.generation]
+
+    return [_decode_payload(p) for p in _download_many(changed)], generations
 
 
 # -----------------------
 # 2) Transform to Silver schema (minimal cleaning/typing)
 # -----------------------
 
-def transform_to_silver(record: Dict[str, Any]) -> pd.DataFrame:
+def _bronze_to_row(record: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Converts the Bronze record into a 1-row Silver dataframe.
+    Flattens one Bronze record into a Silver row (plain dict, untyped).
     Minimal rules:
       - types
       - observed_at_utc from OpenWeather dt (unix seconds)
@@ -107,11 +235,9 @@ def transform_to_silver(record: Dict[str, Any]) -> pd.DataFrame:
     city = data.get("name")
     country = (data.get("sys") or {}).get("country")
 
-    # observed timestamp from API payload
-    dt_unix = data.get("dt")  # seconds
-    observed_at_utc = None
-    if isinstance(dt_unix, (int, float)):
-        observed_at_utc = datetime.fromtimestamp(dt_unix, tz=timezone.utc).isoformat()
+    # observed timestamp from API payload (unix seconds, converted column-wide later)
+    dt_unix = data.get("dt")
+    observed_at_utc = dt_unix if isinstance(dt_unix, (int, float)) else None
 
     # coordinates
     coord = data.get("coord") or {}
@@ -138,7 +264,7 @@ def transform_to_silver(record: Dict[str, Any]) -> pd.DataFrame:
     fetched_at_utc = meta.get("fetched_at_utc")
 
     row = {
-        "observed_at_utc": observed_at_utc,   # will be loaded as TIMESTAMP
+        "observed_at_utc": observed_at_utc,   # unix seconds -> TIMESTAMP
         "fetched_at_utc": fetched_at_utc,     # TIMESTAMP
         "city": city,
         "country": country,
@@ -154,70 +280,244 @@ def transform_to_silver(record: Dict[str, Any]) -> pd.DataFrame:
         "weather_desc": weather_desc,
     }
 
-    df = pd.DataFrame([row])
+    return row
+
+
+SILVER_COLUMNS = [
+    "observed_at_utc",
+    "fetched_at_utc",
+    "city",
+    "country",
+    "lat",
+    "lon",
+    "temp_c",
+    "feels_like_c",
+    "humidity_pct",
+    "pressure_hpa",
+    "wind_speed_ms",
+    "wind_deg",
+    "weather_main",
+    "weather_desc",
+]
+
+_NUMERIC_DTYPES = {
+    "lat": "float64",
+    "lon": "float64",
+    "temp_c": "float64",
+    "feels_like_c": "float64",
+    "wind_speed_ms": "float64",
+    "humidity_pct": "Int64",
+    "pressure_hpa": "Int64",
+    "wind_deg": "Int64",
+}
+
+# Arrow-backed strings: one contiguous buffer per column instead of a PyObject per value
+_STRING_DTYPES = {
+    "city": "string[pyarrow]",
+    "country": "string[pyarrow]",
+    "weather_main": "string[pyarrow]",
+    "weather_desc": "string[pyarrow]",
+}
+
+
+# Only the Bronze fields Silver reads; everything else is skipped by the parser
+_BRONZE_ARROW_SCHEMA = pa.schema([
+    ("_meta", pa.struct([("fetched_at_utc", pa.string())])),
+    ("data", pa.struct([
+        ("name", pa.string()),
+        ("dt", pa.int64()),
+        ("sys", pa.struct([("country", pa.string())])),
+        ("coord", pa.struct([("lat", pa.float64()), ("lon", pa.float64())])),
+        ("main", pa.struct([
+            ("temp", pa.float64()),
+            ("feels_like", pa.float64()),
+            ("humidity", pa.int64()),
+            ("pressure", pa.int64()),
+        ])),
+        ("wind", pa.struct([("speed", pa.float64()), ("deg", pa.int64())])),
+        ("weather", pa.list_(pa.struct([("main", pa.string()), ("description", pa.string())]))),
+    ])),
+])
+
+# Silver column -> path in the Bronze record ("weather" handled separately)
+_BRONZE_FIELD_PATHS = {
+    "observed_at_utc": ("data", ["dt"]),
+    "fetched_at_utc": ("_meta", ["fetched_at_utc"]),
+    "city": ("data", ["name"]),
+    "country": ("data", ["sys", "country"]),
+    "lat": ("data", ["coord", "lat"]),
+    "lon": ("data", ["coord", "lon"]),
+    "temp_c": ("data", ["main", "temp"]),
+    "feels_like_c": ("data", ["main", "feels_like"]),
+    "humidity_pct": ("data", ["main", "humidity"]),
+    "pressure_hpa": ("data", ["main", "pressure"]),
+    "wind_speed_ms": ("data", ["wind", "speed"]),
+    "wind_deg": ("data", ["wind", "deg"]),
+}
+
+
+def _bronze_to_arrow(payloads: List[bytes]) -> pa.Table:
+    """
+    Columnar fast path: parses the payloads as NDJSON straight into Arrow
+    (each Bronze blob is already NDJSON, one line per record) and projects the
+    nested fields with compute kernels, without building Python dicts.
+    Raises pa.ArrowInvalid when a payload does not fit _BRONZE_ARROW_SCHEMA.
+    """
+    parsed = pj.read_json(
+        io.BytesIO(b"\n".join(payloads)),
+        parse_options=pj.ParseOptions(
+            explicit_schema=_BRONZE_ARROW_SCHEMA,
+            unexpected_field_behavior="ignore",
+        ),
+    )
 
-    # Basic typing coercions (keeps NULL when invalid)
-    for col in ["lat", "lon", "temp_c", "feels_like_c", "wind_speed_ms"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    columns = {
+        col: pc.struct_field(parsed[top], path)
+        for col, (top, path) in _BRONZE_FIELD_PATHS.items()
+    }
+
+    # weather array (take first); empty lists -> null before indexing
+    weather = pc.struct_field(parsed["data"], ["weather"])
+    weather = pc.if_else(pc.greater(pc.list_value_length(weather), 0), weather, None)
+    weather0 = pc.list_element(weather, 0)
+    columns["weather_main"] = pc.struct_field(weather0, ["main"])
+    columns["weather_desc"] = pc.struct_field(weather0, ["description"])
+
+    return pa.table({col: columns[col] for col in SILVER_COLUMNS})
 
-    for col in ["humidity_pct", "pressure_hpa", "wind_deg"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
 
-    # Ensure timestamps are parseable
-    for col in ["observed_at_utc", "fetched_at_utc"]:
-        df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+def transform_to_silver(payloads: List[bytes]) -> pd.DataFrame:
+    """
+    Converts raw Bronze payloads into a Silver dataframe (one row per record),
+    deduplicated on the idempotency key (city, country, observed_at_utc).
+    Falls back to the per-record Python path when a payload has unexpected types.
+    """
+    try:
+        df = _bronze_to_arrow(payloads).to_pandas(
+            types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get,
+        )
+    except pa.ArrowInvalid:
+        rows = [_bronze_to_row(r) for p in payloads for r in _parse_ndjson(p)]
+        df = pd.DataFrame.from_records(rows, columns=SILVER_COLUMNS)
+
+    # Basic typing coercions: one astype pass when the payload is clean,
+    # per-column coercion (keeps NULL when invalid) otherwise
+    try:
+        df = df.astype(_NUMERIC_DTYPES)
+    except (TypeError, ValueError):
+        for col, dtype in _NUMERIC_DTYPES.items():
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    df = df.astype(_STRING_DTYPES)
+
+    # Timestamps: epoch seconds straight to datetime, ISO strings parsed (NaT when invalid)
+    df["observed_at_utc"] = pd.to_datetime(df["observed_at_utc"], unit="s", utc=True, errors="coerce")
+    df["fetched_at_utc"] = pd.to_datetime(df["fetched_at_utc"], format="ISO8601", utc=True, errors="coerce")
+
+    # MERGE requires at most one source row per key: keep the latest fetch
+    # (unparseable fetched_at_utc sorts first, so it never beats a valid one),
+    # then order by observation so batches advance the watermark monotonically
+    df = (
+        df.sort_values("fetched_at_utc", kind="stable", na_position="first")
+        .drop_duplicates(subset=["city", "country", "observed_at_utc"], keep="last")
+        .sort_values("observed_at_utc", kind="stable", na_position="first")
+        .reset_index(drop=True)
+    )
 
     return df
 
 
 # -----------------------
-# 3) Load to BigQuery Staging (truncate)
+# 3) Stage as Parquet on GCS (overwrite)
 # -----------------------
 
-def load_to_staging(settings: Settings, df: pd.DataFrame) -> str:
+# Fixed Silver schema (same column order as transform_to_silver)
+SILVER_SCHEMA = [
+    bigquery.SchemaField("observed_at_utc", "TIMESTAMP"),
+    bigquery.SchemaField("fetched_at_utc", "TIMESTAMP"),
+    bigquery.SchemaField("city", "STRING"),
+    bigquery.SchemaField("country", "STRING"),
+    bigquery.SchemaField("lat", "FLOAT64"),
+    bigquery.SchemaField("lon", "FLOAT64"),
+    bigquery.SchemaField("temp_c", "FLOAT64"),
+    bigquery.SchemaField("feels_like_c", "FLOAT64"),
+    bigquery.SchemaField("humidity_pct", "INT64"),
+    bigquery.SchemaField("pressure_hpa", "INT64"),
+    bigquery.SchemaField("wind_speed_ms", "FLOAT64"),
+    bigquery.SchemaField("wind_deg", "INT64"),
+    bigquery.SchemaField("weather_main", "STRING"),
+    bigquery.SchemaField("weather_desc", "STRING"),
+]
+
+ARROW_SCHEMA = pa.schema([
+    ("observed_at_utc", pa.timestamp("us", tz="UTC")),
+    ("fetched_at_utc", pa.timestamp("us", tz="UTC")),
+    ("city", pa.string()),
+    ("country", pa.string()),
+    ("lat", pa.float64()),
+    ("lon", pa.float64()),
+    ("temp_c", pa.float64()),
+    ("feels_like_c", pa.float64()),
+    ("humidity_pct", pa.int64()),
+    ("pressure_hpa", pa.int64()),
+    ("wind_speed_ms", pa.float64()),
+    ("wind_deg", pa.int64()),
+    ("weather_main", pa.string()),
+    ("weather_desc", pa.string()),
+])
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    # Single hop out of pandas, typed by ARROW_SCHEMA (no dtype inference)
+    return pa.Table.from_pandas(df, schema=ARROW_SCHEMA, preserve_index=False)
+
+
+def write_staging_parquet(settings: Settings, df: pd.DataFrame) -> str:
     """
-    Loads dataframe to Staging table (WRITE_TRUNCATE):
-      {project}.{dataset}.{table}_staging
+    Writes dataframe as a single Parquet object (overwritten each batch):
+      gs://{staging_bucket}/{staging_path}
+
+    The MERGE reads it in place as a temporary external table: no BigQuery load job.
+    BigQuery only reads external data colocated with the dataset, so staging_bucket
+    must be in BQ_LOCATION (europe-west9).
+    Returns: gcs_uri
     """
     if df.empty:
-        raise ValueError("Silver dataframe is empty, nothing to load")
+        raise ValueError("Silver dataframe is empty, nothing to stage")
 
-    client = bigquery.Client(project=settings.bq_project, location="europe-west9")
-    staging_table_id = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}_staging"
+    client = _gcs_client()
+    blob = client.bucket(settings.staging_bucket).blob(settings.staging_path)
 
-    job_config = bigquery.LoadJobConfig(
-        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
-        autodetect=True,
-    )
+    buf = io.BytesIO()
+    pq.write_table(_to_arrow(df), buf, compression="snappy")
+    buf.seek(0)
 
-    job = client.load_table_from_dataframe(df, staging_table_id, job_config=job_config)
-    job.result()  # wait
+    blob.upload_from_file(buf, content_type="application/vnd.apache.parquet", checksum="crc32c")
 
-    return staging_table_id
+    return f"gs://{settings.staging_bucket}/{settings.staging_path}"
 
 
 # -----------------------
-# 4) Merge Staging to Target
+# 4) Merge to Target
 # -----------------------
 
-def merge_staging_to_target(settings: Settings) -> None:
-    """
-    Executes MERGE statement to upsert from Staging to Target.
-    Idempotency key: (city, observed_at_utc)
-    """
-    client = bigquery.Client(project=settings.bq_project, location="europe-west9")
-    
-    target_table = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}"
-    staging_table = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}_staging"
-
-    merge_query = f"""
+# Below this size, rows are inlined into the MERGE as a query parameter
+# instead of being staged on GCS first.
+INLINE_MERGE_MAX_ROWS = 500
+
+def _merge_query(target_table: str, source: str) -> str:
+    # Target is partitioned by DATE(observed_at_utc) and clustered by city
+    # (see infra/gcp.md): the @min_ts/@max_ts bound on T prunes the scan to
+    # the batch's partitions instead of the whole table.
+    # Key includes country: OpenWeather resolves e.g. Paris,FR and Paris,US to the
+    # same name; IS NOT DISTINCT FROM so a NULL country still matches itself.
+    return f"""
     MERGE `{target_table}` T
-    USING `{staging_table}` S
-    ON T.city = S.city AND T.observed_at_utc = S.observed_at_utc
+    USING {source} S
+    ON T.city = S.city AND T.country IS NOT DISTINCT FROM S.country
+      AND T.observed_at_utc = S.observed_at_utc
+      AND T.observed_at_utc BETWEEN @min_ts AND @max_ts
     WHEN MATCHED THEN
       UPDATE SET
         fetched_at_utc = S.fetched_at_utc,
-        country = S.country,
         lat = S.lat,
         lon = S.lon,
         temp_c = S.temp_c,
@@ -232,7 +532,69 @@ def merge_staging_to_target(settings: Settings) -> None:
       INSERT ROW;
     """
 
-    job = client.query(merge_query)
+
+def _observed_range_params(df: pd.DataFrame) -> List[bigquery.ScalarQueryParameter]:
+    # All-NaT batch => NULL bounds: nothing matches, rows are inserted (as before)
+    bounds = []
+    for name, value in (("min_ts", df["observed_at_utc"].min()), ("max_ts", df["observed_at_utc"].max())):
+        bounds.append(bigquery.ScalarQueryParameter(name, "TIMESTAMP", None if pd.isna(value) else value.to_pydatetime()))
+    return bounds
+
+
+def merge_staging_to_target(settings: Settings, staging_uri: str, df: pd.DataFrame) -> None:
+    """
+    Executes MERGE statement to upsert from the staged Parquet to Target.
+    Idempotency key: (city, country, observed_at_utc)
+    df: the staged batch, only used for the partition range.
+    """
+    client = _bq_client(settings.bq_project, BQ_LOCATION)
+    
+    target_table = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}"
+
+    staging = bigquery.ExternalConfig(bigquery.ExternalSourceFormat.PARQUET)
+    staging.source_uris = [staging_uri]
+    staging.schema = SILVER_SCHEMA  # fixed: no schema inference on the file
+
+    job_config = bigquery.QueryJobConfig(
+        table_definitions={"staging": staging},
+        query_parameters=_observed_range_params(df),
+    )
+    job = client.query(_merge_query(target_table, "staging"), job_config=job_config)
+    job.result()
+
+
+def merge_rows_to_target(settings: Settings, df: pd.DataFrame) -> None:
+    """
+    Upserts a small dataframe straight into Target, without staging.
+    Rows travel as an ARRAY<STRUCT> query parameter (fields in SILVER_SCHEMA order,
+    so INSERT ROW lines up). Same idempotency key as merge_staging_to_target.
+    """
+    if df.empty:
+        raise ValueError("Silver dataframe is empty, nothing to merge")
+
+    client = _bq_client(settings.bq_project, BQ_LOCATION)
+    target_table = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}"
+
+    # Arrow yields plain Python values (datetime / int / float / str / None),
+    # already typed: no object-dtype copy of the frame, no per-value casts
+    rows = [
+        bigquery.StructQueryParameter(None, *(
+            bigquery.ScalarQueryParameter(f.name, f.field_type, record[f.name])
+            for f in SILVER_SCHEMA
+        ))
+        for record in _to_arrow(df).to_pylist()
+    ]
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("rows", "STRUCT", rows),
+            *_observed_range_params(df),
+        ],
+    )
+    job = client.query(
+        _merge_query(target_table, "(SELECT * FROM UNNEST(@rows))"),
+        job_config=job_config,
+    )
     job.result()
 
 
@@ -243,18 +605,46 @@ def merge_staging_to_target(settings: Settings) -> None:
 def main() -> None:
     settings = load_settings()
 
-    record, gcs_uri = read_latest_bronze_from_gcs(settings)
-    df = transform_to_silver(record)
-
-    # 1. Load to Staging
-    staging_table = load_to_staging(settings, df)
-    print(f"Bronze used: {gcs_uri}")
-    print(f"Loaded {len(df)} rows to Staging: {staging_table}")
-
-    # 2. Merge to Target
-    merge_staging_to_target(settings)
-    print(f"Merged Staging -> Target: {settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}")
-
+    checkpoint = read_checkpoint(settings)
+    watermark = checkpoint.watermark_utc
+    payloads, generations = read_bronze_since(settings, checkpoint)
+    print(f"Bronze files read: {len(payloads)} (watermark: {watermark})")
+    if not payloads:
+        print("No new or changed Bronze files since last run, nothing to load")
+        return
+
+    # No row-level filter on the watermark: cities report with different lags, so
+    # a single max(observed_at_utc) would drop a late city. MERGE is idempotent,
+    # and unchanged files were already skipped by generation.
+    df = transform_to_silver(payloads)
+
+    for start in range(0, len(df), BATCH_SIZE):
+        batch = df.iloc[start:start + BATCH_SIZE]
+
+        target_table = f"{settings.bq_project}.{settings.bq_dataset}.{settings.bq_table}"
+        if len(batch) <= INLINE_MERGE_MAX_ROWS:
+            # 1+2. Rows inlined in the MERGE, no staging
+            merge_rows_to_target(settings, batch)
+            print(f"Merged {len(batch)} rows -> Target: {target_table}")
+        else:
+            # 1. Stage Parquet on GCS
+            staging_uri = write_staging_parquet(settings, batch)
+            print(f"Staged {len(batch)} rows: {staging_uri}")
+
+            # 2. Merge to Target (reads the Parquet in place)
+            merge_staging_to_target(settings, staging_uri, batch)
+            print(f"Merged Staging -> Target: {target_table}")
+
+        # 3. Advance watermark only once the batch is merged
+        batch_max = batch["observed_at_utc"].max()
+        if pd.notna(batch_max) and (watermark is None or batch_max > watermark):
+            watermark = batch_max.to_pydatetime()
+            checkpoint = replace(checkpoint, watermark_utc=watermark)
+            write_checkpoint(settings, checkpoint)
+
+    # 4. All listed files are now merged: next run skips them unless rewritten
+    write_checkpoint(settings, replace(checkpoint, generations=generations))
+    print(f"Watermark: {watermark}")
 
 
 if __name__ == "__main__":